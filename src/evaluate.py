@@ -1,19 +1,182 @@
 import json
-import re
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
+from jsonschema.validators import validator_for
 import json_repair
 from json_repair import repair_json
+try:
+    import fastjsonschema
+    from fastjsonschema import JsonSchemaValueException
+except ImportError:
+    fastjsonschema = None
+    JsonSchemaValueException = ()
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ijson
+except ImportError:
+    ijson = None
 import sys
 import os
+from decimal import Decimal
 import glob
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
 
+# orjson 只用于序列化；解析仍用标准库 json（orjson 会把超出 64 位的整数静默转成浮点数）
+def _dumps_compact(value):
+    """
+    紧凑序列化（返回 bytes），用于生成比较键和写结构化日志
+
+    orjson 会把 NaN/Infinity 写成 null，因此结果中出现 null 时改用标准库，使其与 None 区分开；
+    超出 64 位的整数、孤立代理字符等 orjson 不支持的值同样回退到标准库。
+    标准库输出转义为纯 ASCII，孤立代理字符也能正常编码。
+    """
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(value)
+        except orjson.JSONEncodeError:
+            encoded = None
+        if encoded is not None and b"null" not in encoded:
+            return encoded
+    return json.dumps(value, separators=(",", ":")).encode("ascii")
+
+def _dumps_sorted(value, allow_nan=True):
+    """
+    按键的字典序序列化整个值，结果仅用于判断是否完全一致（返回 bytes）
+
+    与 _dumps_compact 相同，orjson 结果中出现 null 时改用标准库，使 NaN/Infinity 与 None 区分开；
+    allow_nan 为 False 时，值中含 NaN/Infinity 会抛出 ValueError。
+    """
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+        except orjson.JSONEncodeError:
+            encoded = None
+        if encoded is not None and b"null" not in encoded:
+            return encoded
+    return json.dumps(value, sort_keys=True, allow_nan=allow_nan).encode("ascii")
+
 def txt_to_json(text):
+    # 合法JSON直接解析，只有解析失败时才走 json_repair 修复
+    try:
+        return json.loads(text)
+    except (ValueError, TypeError):
+        pass
     good_json_string = repair_json(text, ensure_ascii=False)
     decoded_object = json_repair.loads(good_json_string)
     return decoded_object
 
+@lru_cache(maxsize=32)
+def txt_to_json_cached(text):
+    """
+    带缓存的 txt_to_json：相同的响应文本只解析一次。返回的对象被缓存共享，调用方不要修改
+
+    缓存会保留解析结果，容量保持很小；process_single_file 每条响应只解析一次，不经过这里
+    """
+    return txt_to_json(text)
+
+# schema 校验器缓存：同一文件内的 item 通常共用同一份 json_schema，
+# 避免每次调用都重新编译 schema 并构建校验器
+_VALIDATOR_CACHE = {}
+_FAST_VALIDATOR_CACHE = {}
+
+def _get_cached_for_schema(cache, schema, build):
+    """按 schema 内容缓存 build(schema) 的结果：内容相同的 schema 共享同一个校验器"""
+    # 只按内容作键、不保存 schema 对象本身：逐条读取的每个 item 都是新的 schema 对象，
+    # 缓存大小只随不同 schema 的个数增长，而不是随 item 数增长
+    content_key = _dumps_sorted(schema)
+    if content_key in cache:
+        return cache[content_key]
+    value = build(schema)
+    cache[content_key] = value
+    return value
+
+def _build_validator(schema):
+    validator_cls = validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+# 只有明确声明为这些 draft 的 schema 才走 fastjsonschema；其余（含未声明 $schema 的）一律交给 jsonschema，
+# 因为 fastjsonschema 会把其他 draft 当作 draft-07 编译，静默忽略其不支持的关键字
+_FAST_SCHEMA_DRAFTS = {
+    "http://json-schema.org/draft-04/schema",
+    "http://json-schema.org/draft-06/schema",
+    "http://json-schema.org/draft-07/schema",
+}
+
+def _has_float_multiple_of(schema):
+    """schema 中是否有小数形式的 multipleOf（fastjsonschema 与 jsonschema 对其判断不一致，如 0.07 与 0.01）"""
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if isinstance(node.get("multipleOf"), float):
+                return True
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return False
+
+def _build_fast_validator(schema):
+    if fastjsonschema is None or not isinstance(schema, dict):
+        return None
+    declared_draft = schema.get("$schema")
+    if not isinstance(declared_draft, str) or declared_draft.rstrip("#") not in _FAST_SCHEMA_DRAFTS:
+        return None
+    # 已知与 jsonschema 结论不一致的关键字直接交给 jsonschema
+    if _has_float_multiple_of(schema):
+        return None
+    try:
+        # 先按 jsonschema 的规则检查 schema 本身，非法 schema 交给 jsonschema 报告异常
+        validator_for(schema).check_schema(schema)
+        # use_default=False：不要把 schema 中的默认值写回到模型响应里
+        # use_formats=False：与 jsonschema 默认行为一致，不校验 format
+        return fastjsonschema.compile(schema, use_default=False, use_formats=False)
+    except Exception:
+        return None
+
+def get_validator(schema):
+    """获取（并缓存）schema 对应的 jsonschema 校验器实例"""
+    return _get_cached_for_schema(_VALIDATOR_CACHE, schema, _build_validator)
+
+def get_fast_validator(schema):
+    """获取（并缓存）fastjsonschema 编译后的校验函数，不可用时返回 None"""
+    return _get_cached_for_schema(_FAST_VALIDATOR_CACHE, schema, _build_fast_validator)
+
+def collect_schema_errors(instance, schema):
+    """
+    校验 instance 是否符合 schema，返回全部 schema_validation 错误详情（校验通过时为空列表）
+
+    优先用 fastjsonschema 快速判断是否通过；只有未通过时才用 jsonschema 的 iter_errors
+    一次性收集所有错误，便于完整定位问题。fastjsonschema 判定通过时直接采信，
+    因此只对声明了 draft-04/06/07 的 schema 启用，已知与 jsonschema 不一致的情况
+    （如小数 multipleOf）在 _build_fast_validator 中交给 jsonschema；
+    fastjsonschema 未通过而 jsonschema 没有报错时，以 jsonschema 为准。
+    """
+    fast_validate = get_fast_validator(schema)
+    if fast_validate is not None:
+        try:
+            fast_validate(instance)
+            return []
+        except JsonSchemaValueException:
+            pass
+
+    schema_errors = []
+    for error in get_validator(schema).iter_errors(instance):
+        error_path = " -> ".join([str(p) for p in error.absolute_path]) if error.absolute_path else "根级别"
+        schema_errors.append({
+            "type": "schema_validation",
+            "path": error_path,
+            "message": error.message,
+            "failed_value": error.instance
+        })
+
+    return schema_errors
+
 def normalize_string(s):
     """标准化字符串用于比较"""
     if not isinstance(s, str):
@@ -21,10 +184,28 @@ def normalize_string(s):
     # 统一大小写
     s = s.lower()
     # 移除多余空格
-    s = re.sub(r'\s+', ' ', s.strip())
+    s = ' '.join(s.split())
     # 可以添加更多标准化规则
     return s
 
+# JSON 中的基本类型（非对象、非数组）
+_PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+
+# 栈遍历中标记"响应中缺少该键"
+_MISSING = object()
+
+def canonical_json(item):
+    """生成用于无序比较的规范化JSON（bytes）：对象键按字典序排列，数组元素排序"""
+    if isinstance(item, dict):
+        return b"{" + b",".join(
+            _dumps_compact(k) + b":" + canonical_json(item[k]) for k in sorted(item)
+        ) + b"}"
+    elif isinstance(item, list):
+        # 嵌套数组同样按无序处理：对元素的规范化结果排序
+        return b"[" + b",".join(sorted(canonical_json(sub_item) for sub_item in item)) + b"]"
+    else:
+        return _dumps_compact(item)
+
 def validate_model_response(
     model_response,
     target,
@@ -50,6 +231,34 @@ def validate_model_response(
             - detailed_errors: 具体的错误详情列表
     """
 
+    # 第一步：将文本转换为JSON格式
+    try:
+        model_response_json = txt_to_json_cached(model_response)
+    except Exception as e:
+        return 0, f"❌ 文本转JSON失败: {str(e)}", []
+
+    return validate_model_response_parsed(
+        model_response_json,
+        target,
+        required_json_schema,
+        unordered_list_keys=unordered_list_keys,
+        no_required_eval_acc_keys=no_required_eval_acc_keys
+    )
+
+
+def validate_model_response_parsed(
+    model_response_json,
+    target,
+    required_json_schema,
+    unordered_list_keys=None,
+    no_required_eval_acc_keys=None
+):
+    """
+    验证已解析为JSON对象的模型响应的格式和内容，参数和返回值同 validate_model_response。
+
+    调用方已经解析过模型响应时使用，避免重复执行 txt_to_json。
+    """
+
     # 标准化集合类型
     if unordered_list_keys is not None and not isinstance(unordered_list_keys, (set, list, tuple)):
         unordered_list_keys = set([unordered_list_keys])
@@ -61,41 +270,28 @@ def validate_model_response(
     if isinstance(no_required_eval_acc_keys, (list, tuple)):
         no_required_eval_acc_keys = set(no_required_eval_acc_keys)
 
-    # 第一步：将文本转换为JSON格式
-    try:
-        model_response_json = txt_to_json(model_response)
-    except Exception as e:
-        return 0, f"❌ 文本转JSON失败: {str(e)}", []
-
     # 第二步：验证JSON格式是否符合schema
     try:
-        validate(instance=model_response_json, schema=required_json_schema)
-    except ValidationError as e:
-        error_path = " -> ".join([str(p) for p in e.absolute_path]) if e.absolute_path else "根级别"
-        schema_error = {
-            "type": "schema_validation",
-            "path": error_path,
-            "message": e.message,
-            "failed_value": getattr(e, 'instance', None)
-        }
-        return 0, f"❌ 格式验证失败: 在路径 '{error_path}' 处，{e.message}", [schema_error]
+        schema_errors = collect_schema_errors(model_response_json, required_json_schema)
     except Exception as e:
         return 0, f"❌ Schema验证异常: {str(e)}", []
 
+    if schema_errors:
+        error_messages = "; ".join(
+            f"在路径 '{error['path']}' 处，{error['message']}" for error in schema_errors
+        )
+        return 0, f"❌ 格式验证失败: {error_messages}", schema_errors
+
     # 第三步：格式正确，比较内容是否一致
     differences = []
     detailed_errors = []
 
-    def should_skip_by_keyname(key_name: str) -> bool:
-        """是否根据键名跳过内容比对（任意层级）"""
-        return bool(no_required_eval_acc_keys and key_name in no_required_eval_acc_keys)
-
     def create_comparable_item(item):
-        """创建忽略指定键的item副本，用于比较"""
+        """创建忽略指定键的item副本（任意层级按键名跳过），用于比较"""
         if isinstance(item, dict):
             comparable = {}
             for k, v in item.items():
-                if should_skip_by_keyname(k):
+                if k in no_required_eval_acc_keys:
                     continue
                 comparable[k] = create_comparable_item(v)
             return comparable
@@ -104,140 +300,119 @@ def validate_model_response(
         else:
             return item
     
-    def compare_nested(response_data, target_data, path=""):
-        """递归比较嵌套的数据结构"""
-        current_key = path.split('.')[-1] if path else ""
+    def compare_nested(root_response, root_target):
+        """
+        使用显式栈遍历比较嵌套的数据结构（避免递归调用开销和递归深度限制）。
 
-        # 跳过不需要验证的key
-        if should_skip_by_keyname(current_key):
-            return
+        传入的数据已去掉不参与比对的键，这里只做结构和内容的比较。
+        """
+        stack = [(root_response, root_target, "")]
+        while stack:
+            response_data, target_data, path = stack.pop()
 
-        if isinstance(target_data, dict) and isinstance(response_data, dict):
-            for key in target_data.keys():
-                current_path = f"{path}.{key}" if path else key
-
-                # 对子键也做"按键名跳过"判断
-                if should_skip_by_keyname(key):
-                    continue
-
-                target_value = target_data[key]
-                if key not in response_data:
-                    error_detail = {
-                        "type": "missing_key",
-                        "path": current_path,
-                        "expected_value": target_value,
-                        "actual_value": None
-                    }
-                    differences.append(f"缺少字段 '{current_path}'")
-                    detailed_errors.append(error_detail)
-                else:
-                    compare_nested(response_data[key], target_value, current_path)
-
-        elif isinstance(target_data, list) and isinstance(response_data, list):
-            # 如果该列表键名需要跳过，则不做内容比对
-            if should_skip_by_keyname(current_key):
-                return
-
-            # 对所有列表都进行无序比较
-            if len(response_data) != len(target_data):
+            if response_data is _MISSING:
                 error_detail = {
-                    "type": "list_length_mismatch",
+                    "type": "missing_key",
                     "path": path,
-                    "expected_length": len(target_data),
-                    "actual_length": len(response_data)
+                    "expected_value": target_data,
+                    "actual_value": None
                 }
-                differences.append(f"'{path}' 列表长度不匹配: 期望 {len(target_data)}, 实际 {len(response_data)}")
+                differences.append(f"缺少字段 '{path}'")
                 detailed_errors.append(error_detail)
-            else:
-                # 过滤掉不需要比较的字段后再进行无序比较
-                def filter_dict_for_comparison(item):
-                    """过滤掉不需要比较的字段"""
-                    if isinstance(item, dict):
-                        filtered = {}
-                        for k, v in item.items():
-                            if not should_skip_by_keyname(k):
-                                filtered[k] = v
-                        return filtered
-                    return item
-
-                # 对列表中的元素进行过滤和无序比较
-                filtered_response = [filter_dict_for_comparison(item) for item in response_data]
-                filtered_target = [filter_dict_for_comparison(item) for item in target_data]
-                
-                # 使用集合进行无序比较，确保对象内部键也按字典序排列
-                def normalize_for_comparison(item):
-                    """标准化数据结构用于无序比较"""
-                    if isinstance(item, dict):
-                        result = {}
-                        for k, v in item.items():
-                            result[k] = normalize_for_comparison(v)
-                        return result
-                    elif isinstance(item, list):
-                        # 对数组元素进行标准化后排序
-                        normalized_items = [normalize_for_comparison(sub_item) for sub_item in item]
-                        # 使用JSON字符串作为排序键
-                        return sorted(normalized_items, key=lambda x: json.dumps(x, ensure_ascii=False, sort_keys=True))
-                    else:
-                        return item
-
-                # 在比较时使用
-                normalized_response = [normalize_for_comparison(item) for item in filtered_response]
-                normalized_target = [normalize_for_comparison(item) for item in filtered_target]
-
-                response_set = {json.dumps(item, ensure_ascii=False, sort_keys=True) for item in normalized_response}
-                target_set = {json.dumps(item, ensure_ascii=False, sort_keys=True) for item in normalized_target}
-
-                if response_set != target_set:
+                continue
+
+            if isinstance(target_data, dict) and isinstance(response_data, dict):
+                children = []
+                for key in target_data.keys():
+                    current_path = f"{path}.{key}" if path else key
+                    # 缺失的键也入栈，保证错误按键的原始顺序输出
+                    children.append((response_data.get(key, _MISSING), target_data[key], current_path))
+                # 逆序入栈，使出栈顺序与键的原始顺序一致
+                stack.extend(reversed(children))
+
+            elif isinstance(target_data, list) and isinstance(response_data, list):
+                # 对所有列表都进行无序比较
+                if len(response_data) != len(target_data):
                     error_detail = {
-                        "type": "unordered_list_content_mismatch",
+                        "type": "list_length_mismatch",
                         "path": path,
-                        "expected_items": filtered_target,
-                        "actual_items": filtered_response
+                        "expected_length": len(target_data),
+                        "actual_length": len(response_data)
                     }
-                    excluded_fields = list(no_required_eval_acc_keys or [])
-                    excluded_msg = f"，已排除 {excluded_fields} 字段" if excluded_fields else ""
-                    differences.append(f"'{path}' 列表内容不匹配（无序比较{excluded_msg}）")
+                    differences.append(f"'{path}' 列表长度不匹配: 期望 {len(target_data)}, 实际 {len(response_data)}")
                     detailed_errors.append(error_detail)
+                else:
+                    # 按多重集合进行无序比较（重复元素的个数也需一致）
+                    if (all(isinstance(item, _PRIMITIVE_TYPES) for item in response_data)
+                            and all(isinstance(item, _PRIMITIVE_TYPES) for item in target_data)):
+                        # 元素全为基本类型时直接计数，无需序列化；
+                        # 计数键带上类型，使 1、1.0、True 仍被视为不同的值（与 canonical_json 一致）
+                        response_counter = Counter((type(item), item) for item in response_data)
+                        target_counter = Counter((type(item), item) for item in target_data)
+                    else:
+                        response_counter = Counter(canonical_json(item) for item in response_data)
+                        target_counter = Counter(canonical_json(item) for item in target_data)
+
+                    if response_counter != target_counter:
+                        error_detail = {
+                            "type": "unordered_list_content_mismatch",
+                            "path": path,
+                            "expected_items": target_data,
+                            "actual_items": response_data
+                        }
+                        excluded_fields = list(no_required_eval_acc_keys or [])
+                        excluded_msg = f"，已排除 {excluded_fields} 字段" if excluded_fields else ""
+                        differences.append(f"'{path}' 列表内容不匹配（无序比较{excluded_msg}）")
+                        detailed_errors.append(error_detail)
 
-        else:
-            # 基本类型比较 - 添加字符串标准化
-            def normalize_string(s):
-                """标准化字符串用于比较"""
-                if not isinstance(s, str):
-                    return s
-                # 统一大小写
-                s = s.lower()
-                # 移除多余空格
-                s = re.sub(r'\s+', ' ', s.strip())
-                # 可以添加更多标准化规则，比如：
-                # s = s.replace('app', 'APP')  # 特定词汇标准化
-                return s
-            
-            if isinstance(response_data, str) and isinstance(target_data, str):
-                # 对字符串进行标准化比较
-                if normalize_string(response_data) != normalize_string(target_data):
-                    error_detail = {
-                        "type": "value_mismatch",
-                        "path": path,
-                        "expected_value": target_data,
-                        "actual_value": response_data
-                    }
-                    differences.append(f"'{path}' 值不匹配: 期望 '{target_data}', 实际 '{response_data}'")
-                    detailed_errors.append(error_detail)
             else:
-                # 非字符串的严格比较
-                if response_data != target_data:
-                    error_detail = {
-                        "type": "value_mismatch",
-                        "path": path,
-                        "expected_value": target_data,
-                        "actual_value": response_data
-                    }
-                    differences.append(f"'{path}' 值不匹配: 期望 '{target_data}', 实际 '{response_data}'")
-                    detailed_errors.append(error_detail)
+                # 基本类型比较 - 字符串先标准化再比较
+                if isinstance(response_data, str) and isinstance(target_data, str):
+                    # 对字符串进行标准化比较
+                    if normalize_string(response_data) != normalize_string(target_data):
+                        error_detail = {
+                            "type": "value_mismatch",
+                            "path": path,
+                            "expected_value": target_data,
+                            "actual_value": response_data
+                        }
+                        differences.append(f"'{path}' 值不匹配: 期望 '{target_data}', 实际 '{response_data}'")
+                        detailed_errors.append(error_detail)
+                else:
+                    # 非字符串的严格比较
+                    if response_data != target_data:
+                        error_detail = {
+                            "type": "value_mismatch",
+                            "path": path,
+                            "expected_value": target_data,
+                            "actual_value": response_data
+                        }
+                        differences.append(f"'{path}' 值不匹配: 期望 '{target_data}', 实际 '{response_data}'")
+                        detailed_errors.append(error_detail)
     
+    # 预先一次性去掉不参与比对的键（任意层级），比较过程中无需再逐个键判断
+    if no_required_eval_acc_keys:
+        response_for_compare = create_comparable_item(model_response_json)
+        target_for_compare = create_comparable_item(target)
+    else:
+        response_for_compare = model_response_json
+        target_for_compare = target
+
+    # 与目标完全一致（键按字典序序列化后相同）时直接判定正确，
+    # 只有不一致时才逐项比较以给出详细差异。
+    # 含 NaN/Infinity 时不走捷径：NaN 与自身不相等，交给逐项比较按原有规则处理
+    try:
+        exact_match = (
+            _dumps_sorted(response_for_compare, allow_nan=False)
+            == _dumps_sorted(target_for_compare, allow_nan=False)
+        )
+    except ValueError:
+        exact_match = False
+    if exact_match:
+        return 1, "✅ Correct", []
+
     # 执行比较（仅对内容做 acc 比对；schema 验证已在上方完成）
-    compare_nested(model_response_json, target)
+    compare_nested(response_for_compare, target_for_compare)
 
     # 根据比较结果返回
     if not differences:
@@ -247,142 +422,240 @@ def validate_model_response(
         return 0.2, f"🔶 格式正确，但内容不一致: {error_details}", detailed_errors
 
 
-def process_single_file(data_path, log_file_path):
-    """处理单个JSON文件并生成对应的日志"""
-    
-    # 重定向stdout到文件，同时保留控制台输出
-    class Tee:
-        def __init__(self, *files):
-            self.files = files
-        def write(self, obj):
-            for f in self.files:
-                f.write(obj)
-                f.flush()
-        def flush(self):
-            for f in self.files:
-                f.flush()
+def _decimals_to_float(value):
+    """把 ijson 解析出的 Decimal 转成 float，与 json.load 的结果保持一致"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return {k: _decimals_to_float(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decimals_to_float(v) for v in value]
+    return value
+
+
+def iter_data_items(data_path):
+    """
+    逐条读取数据文件中的测试项目；ijson 可用时流式解析，无需把整个文件载入内存。
+
+    内存占用与文件中的条目数无关的前提是处理完的 item 不在任何地方被保留：
+    process_single_file 直接调用 txt_to_json，不经过 txt_to_json_cached；
+    schema 校验器缓存按内容作键，只随不同 schema 的数量增长，不引用 item 中的对象。
+    """
+    with open(data_path, "rb") as data_file:
+        if ijson is not None:
+            # 不用 use_float=True：yajl2_c 后端在该模式下遇到超出 int64 的整数会报 integer overflow；
+            # 默认模式下整数保持为 int，小数为 Decimal，再统一转成 float
+            for item in ijson.items(data_file, "item"):
+                yield _decimals_to_float(item)
+        else:
+            yield from json.load(data_file)
+
+
+def render_record(record):
+    """将一条结构化日志记录渲染为可读的文本行列表"""
+    lines = []
+    log = lines.append
+    record_type = record["type"]
+
+    if record_type == "file":
+        log("=" * 80)
+        log(f"📊 模型响应验证结果 - {record['file_name']}")
+        log("=" * 80)
+
+    elif record_type == "item":
+        score = record["score"]
+        if score == 1:
+            status_icon = "✅"
+        elif score == 0.2:
+            status_icon = "🔶"
+        else:
+            status_icon = "❌"
+
+        log(f"\n{'-' * 60}")
+        log(f"📝 测试项目 {record['idx']} {status_icon}")
+        log(f"{'-' * 60}")
+
+        # 显示验证范围信息
+        no_required_eval_acc_keys = record["no_required_eval_acc_keys"]
+        if no_required_eval_acc_keys:
+            log(f"🔍 比对范围: 排除键 {list(no_required_eval_acc_keys)}（任意层级按键名跳过）")
+        else:
+            log("🔍 比对范围: 比较所有键")
+
+        # 显示模型响应（格式化）
+        if record["parse_error"] is None:
+            log("🤖 模型响应:")
+            log(json.dumps(record["model_response"], ensure_ascii=False, indent=2))
+        else:
+            log(f"🤖 模型响应 (原始): {record['model_response']}")
+            log(f"⚠️  JSON解析失败: {record['parse_error']}")
+
+        # 显示目标答案（格式化）
+        log("\n🎯 目标答案:")
+        log(json.dumps(record["target"], ensure_ascii=False, indent=2))
+
+        # 显示验证结果
+        log(f"\n📊 验证结果: 分数 {score}")
+        log(f"💬 详细信息: {record['message']}")
+
+        # 显示具体的错误详情
+        detailed_errors = record["errors"]
+        if detailed_errors:
+            log("\n🔍 具体错误详情:")
+            for i, error in enumerate(detailed_errors, 1):
+                log(f"  {i}. 错误类型: {error['type']}")
+                log(f"     路径: {error['path']}")
+                if error['type'] == 'missing_key':
+                    log(f"     问题: 缺少必需的key")
+                    log(f"     期望值: {error['expected_value']}")
+                elif error['type'] == 'extra_key':
+                    log(f"     问题: 存在多余的key")
+                    log(f"     实际值: {error['actual_value']}")
+                elif error['type'] == 'value_mismatch':
+                    log(f"     问题: key存在但值不匹配")
+                    log(f"     期望值: {error['expected_value']}")
+                    log(f"     实际值: {error['actual_value']}")
+                elif error['type'] == 'list_length_mismatch':
+                    log(f"     问题: 列表长度不匹配")
+                    log(f"     期望长度: {error['expected_length']}")
+                    log(f"     实际长度: {error['actual_length']}")
+                elif error['type'] == 'unordered_list_content_mismatch':
+                    log(f"     问题: 无序列表内容不匹配")
+                    if 'expected_items' in error:
+                        log(f"     期望项: {error['expected_items']}")
+                        log(f"     实际项: {error['actual_items']}")
+                elif error['type'] == 'schema_validation':
+                    log(f"     问题: Schema验证失败")
+                    log(f"     错误信息: {error['message']}")
+                    if error.get('failed_value', None) is not None:
+                        log(f"     失败的值: {error['failed_value']}")
+                log("")
+
+        # 如果是部分正确或错误，显示更多细节
+        if score != 1:
+            log(f"🔍 问题分析: {record['message']}")
+
+    elif record_type == "summary":
+        total_items = record["total_items"]
+        correct_count = record["correct_count"]
+        partial_count = record["partial_count"]
+        error_count = record["error_count"]
+
+        log("\n" + "=" * 80)
+        log("📈 总体统计结果")
+        log("=" * 80)
+        log(f"📊 总测试项目: {total_items}")
+        log(f"✅ 完全正确: {correct_count} ({correct_count/total_items*100:.1f}%)")
+        log(f"🔶 格式正确但内容不一致: {partial_count} ({partial_count/total_items*100:.1f}%)")
+        log(f"❌ 格式错误: {error_count} ({error_count/total_items*100:.1f}%)")
+        log(f"🎯 总体准确率: {record['accuracy']:.1f}%")
+        log("=" * 80)
+
+    elif record_type == "error":
+        log(f"❌ 处理文件 {record['data_path']} 时出错: {record['message']}")
+
+    return lines
+
+
+def collect_distinct_schemas(data_paths):
+    """扫描数据文件，收集其中所有不同的 json_schema（按内容去重）"""
+    schemas = {}
+    for data_path in data_paths:
+        try:
+            for item in iter_data_items(data_path):
+                schema = item.get("json_schema")
+                if schema is not None:
+                    schemas.setdefault(_dumps_sorted(schema), schema)
+        except Exception:
+            # 预编译只是优化：文件损坏等错误留给 process_single_file 按文件记录
+            continue
+    return list(schemas.values())
+
+
+def precompile_schemas(schemas):
+    """提前编译一批 schema 的校验器并放入缓存，避免在逐条评测时才首次编译"""
+    for schema in schemas:
+        try:
+            get_fast_validator(schema)
+            get_validator(schema)
+        except Exception:
+            # 非法的 schema 留到评测时按原逻辑报告 "Schema验证异常"
+            pass
+
+
+def process_single_file(data_path, log_file_path, echo_to_console=True):
+    """
+    处理单个JSON文件，并把结果写入结构化日志（JSONL，每行一条记录）
+
+    日志中保存的是原始结果而不是排版后的文本，可读日志由 render_log.py 按需生成。
+    echo_to_console 为 True 时，同时把可读格式输出到控制台。
+    """
 
     # 打开日志文件
-    with open(log_file_path, 'w', encoding='utf-8') as f:
-        # 创建同时输出到文件和控制台的对象
-        original_stdout = sys.stdout
-        sys.stdout = Tee(sys.stdout, f)
-        
+    with open(log_file_path, 'wb') as f:
+        def write_record(record):
+            f.write(_dumps_compact(record) + b"\n")
+            if echo_to_console:
+                sys.stdout.write("\n".join(render_record(record)) + "\n")
+
         try:
-            # 加载数据文件
-            with open(data_path, "r", encoding="utf-8") as data_file:
-                data = json.load(data_file)
-        
-            print("=" * 80)
-            print(f"📊 模型响应验证结果 - {os.path.basename(data_path)}")
-            print("=" * 80)
+            write_record({"type": "file", "file_name": os.path.basename(data_path)})
 
-            total_items = len(data)
+            # 数据文件逐条读取，总数在遍历结束后才能确定
+            total_items = 0
             correct_count = 0
             partial_count = 0
             error_count = 0
 
-            for idx, item in enumerate(data, 1):
+            for idx, item in enumerate(iter_data_items(data_path), 1):
+                total_items = idx
+
                 # 读取"需要排除的键名集合"
                 no_required_eval_acc_keys = item.get("no_required_eval_acc_keys", None)
 
                 # 读取"无序比较列表键名集合"（保持原有功能）
                 unordered_list_keys = item.get("unordered_list_keys", None)
 
-                score, exp, detailed_errors = validate_model_response(
-                    item["model_response"],
-                    item["target"],
-                    item["json_schema"],
-                    unordered_list_keys=unordered_list_keys,
-                    no_required_eval_acc_keys=no_required_eval_acc_keys
-                )
+                # 模型响应只解析一次，校验和展示共用解析结果
+                try:
+                    model_json = txt_to_json(item["model_response"])
+                    parse_error = None
+                except Exception as e:
+                    model_json, parse_error = None, e
+
+                if parse_error is None:
+                    score, exp, detailed_errors = validate_model_response_parsed(
+                        model_json,
+                        item["target"],
+                        item["json_schema"],
+                        unordered_list_keys=unordered_list_keys,
+                        no_required_eval_acc_keys=no_required_eval_acc_keys
+                    )
+                else:
+                    score, exp, detailed_errors = 0, f"❌ 文本转JSON失败: {str(parse_error)}", []
 
                 # 统计结果
                 if score == 1:
                     correct_count += 1
-                    status_icon = "✅"
                 elif score == 0.2:
                     partial_count += 1
-                    status_icon = "🔶"
                 else:
                     error_count += 1
-                    status_icon = "❌"
 
-                print(f"\n{'-' * 60}")
-                print(f"📝 测试项目 {idx}/{total_items} {status_icon}")
-                print(f"{'-' * 60}")
-
-                # 显示验证范围信息
-                if no_required_eval_acc_keys:
-                    print(f"🔍 比对范围: 排除键 {list(no_required_eval_acc_keys)}（任意层级按键名跳过）")
-                else:
-                    print("🔍 比对范围: 比较所有键")
-
-                # 显示模型响应（格式化）
-                try:
-                    model_json = txt_to_json(item["model_response"])
-                    print("🤖 模型响应:")
-                    print(json.dumps(model_json, ensure_ascii=False, indent=2))
-                except Exception as e:
-                    print(f"🤖 模型响应 (原始): {item['model_response']}")
-                    print(f"⚠️  JSON解析失败: {e}")
-
-                # 显示目标答案（格式化）
-                print("\n🎯 目标答案:")
-                print(json.dumps(item["target"], ensure_ascii=False, indent=2))
-
-                # 显示验证结果
-                print(f"\n📊 验证结果: 分数 {score}")
-                print(f"💬 详细信息: {exp}")
-
-                # 显示具体的错误详情
-                if detailed_errors:
-                    print("\n🔍 具体错误详情:")
-                    for i, error in enumerate(detailed_errors, 1):
-                        print(f"  {i}. 错误类型: {error['type']}")
-                        print(f"     路径: {error['path']}")
-                        if error['type'] == 'missing_key':
-                            print(f"     问题: 缺少必需的key")
-                            print(f"     期望值: {error['expected_value']}")
-                        elif error['type'] == 'extra_key':
-                            print(f"     问题: 存在多余的key")
-                            print(f"     实际值: {error['actual_value']}")
-                        elif error['type'] == 'value_mismatch':
-                            print(f"     问题: key存在但值不匹配")
-                            print(f"     期望值: {error['expected_value']}")
-                            print(f"     实际值: {error['actual_value']}")
-                        elif error['type'] == 'list_length_mismatch':
-                            print(f"     问题: 列表长度不匹配")
-                            print(f"     期望长度: {error['expected_length']}")
-                            print(f"     实际长度: {error['actual_length']}")
-                        elif error['type'] == 'unordered_list_content_mismatch':
-                            print(f"     问题: 无序列表内容不匹配")
-                            if 'expected_items' in error:
-                                print(f"     期望项: {error['expected_items']}")
-                                print(f"     实际项: {error['actual_items']}")
-                        elif error['type'] == 'schema_validation':
-                            print(f"     问题: Schema验证失败")
-                            print(f"     错误信息: {error['message']}")
-                            if error.get('failed_value', None) is not None:
-                                print(f"     失败的值: {error['failed_value']}")
-                        print()
-
-                # 如果是部分正确或错误，显示更多细节
-                if score != 1:
-                    print(f"🔍 问题分析: {exp}")
-
-            # 显示总体统计
-            print("\n" + "=" * 80)
-            print("📈 总体统计结果")
-            print("=" * 80)
-            print(f"📊 总测试项目: {total_items}")
-            print(f"✅ 完全正确: {correct_count} ({correct_count/total_items*100:.1f}%)")
-            print(f"🔶 格式正确但内容不一致: {partial_count} ({partial_count/total_items*100:.1f}%)")
-            print(f"❌ 格式错误: {error_count} ({error_count/total_items*100:.1f}%)")
-            print(f"🎯 总体准确率: {(correct_count + partial_count*0.2)/total_items*100:.1f}%")
-            print("=" * 80)
-            
-            return {
+                write_record({
+                    "type": "item",
+                    "idx": idx,
+                    "score": score,
+                    "message": exp,
+                    "errors": detailed_errors,
+                    "no_required_eval_acc_keys": no_required_eval_acc_keys,
+                    # 解析失败时保存原始响应文本
+                    "model_response": model_json if parse_error is None else item["model_response"],
+                    "parse_error": None if parse_error is None else str(parse_error),
+                    "target": item["target"]
+                })
+
+            result = {
                 'file_name': os.path.basename(data_path),
                 'total_items': total_items,
                 'correct_count': correct_count,
@@ -390,14 +663,12 @@ def process_single_file(data_path, log_file_path):
                 'error_count': error_count,
                 'accuracy': (correct_count + partial_count*0.2)/total_items*100
             }
+            write_record({"type": "summary", **result})
+            return result
             
         except Exception as e:
-            print(f"❌ 处理文件 {data_path} 时出错: {str(e)}")
+            write_record({"type": "error", "data_path": str(data_path), "message": str(e)})
             return None
-            
-        finally:
-            # 恢复原始stdout
-            sys.stdout = original_stdout
 
 
 if __name__ == "__main__":
@@ -425,20 +696,34 @@ if __name__ == "__main__":
     # 存储所有文件的统计结果
     all_results = []
     
-    # 处理每个JSON文件
-    for json_file in sorted(json_files):
-        file_name = os.path.basename(json_file)
-        log_file_name = os.path.splitext(file_name)[0] + "_validation.log"
-        log_file_path = os.path.join(log_directory, log_file_name)
-        
-        print(f"\n{'='*60}")
-        print(f"🔄 正在处理: {file_name}")
-        print(f"📝 日志输出: {log_file_name}")
-        print(f"{'='*60}")
-        
-        result = process_single_file(json_file, log_file_path)
-        if result:
-            all_results.append(result)
+    # 各文件相互独立，使用多进程并行处理；子进程只写日志文件，控制台输出由主进程按文件顺序打印
+    json_files = sorted(json_files)
+    log_file_paths = [
+        os.path.join(log_directory, os.path.splitext(os.path.basename(json_file))[0] + "_validation.jsonl")
+        for json_file in json_files
+    ]
+
+    # 预先收集所有不同的 schema，每个工作进程启动时统一编译，避免在评测循环中首次编译
+    distinct_schemas = collect_distinct_schemas(json_files)
+    print(f"🧩 共 {len(distinct_schemas)} 个不同的 json_schema")
+
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        initializer=precompile_schemas,
+        initargs=(distinct_schemas,)
+    ) as executor:
+        results = executor.map(process_single_file, json_files, log_file_paths, repeat(False))
+        for json_file, log_file_path, result in zip(json_files, log_file_paths, results):
+            print(f"\n{'='*60}")
+            print(f"🔄 已处理: {os.path.basename(json_file)}")
+            print(f"📝 日志输出: {os.path.basename(log_file_path)}")
+            print(f"{'='*60}")
+
+            if result:
+                print(f"🎯 准确率: {result['accuracy']:.1f}% ({result['total_items']} 个测试项目)")
+                all_results.append(result)
+            else:
+                print("❌ 处理失败，详见日志文件")
     
     # 输出汇总统计
     print(f"\n{'='*80}")
@@ -467,3 +752,4 @@ if __name__ == "__main__":
             print(f"{result['file_name']:<50} {result['total_items']:<8} {result['correct_count']:<6} {result['partial_count']:<6} {result['error_count']:<6} {result['accuracy']:<8.1f}%")
     
     print(f"\n✅ 所有文件处理完成！日志文件保存在: {log_directory}")
+    print(f"💡 如需可读格式的日志，请运行: python3 {current_dir / 'render_log.py'}")
@@ -0,0 +1,33 @@
+import json
+import sys
+import os
+import glob
+from pathlib import Path
+
+from evaluate import render_record
+
+
+def render_log_file(jsonl_path, log_file_path):
+    """将 evaluate.py 生成的结构化日志（JSONL）渲染为可读的文本日志"""
+    with open(jsonl_path, "r", encoding="utf-8") as src, open(log_file_path, "w", encoding="utf-8") as dst:
+        for line in src:
+            if not line.strip():
+                continue
+            dst.write("\n".join(render_record(json.loads(line))) + "\n")
+
+
+if __name__ == "__main__":
+    # 默认渲染 results 目录下的全部结构化日志，也可以在命令行中指定文件
+    current_dir = Path(__file__).parent
+    log_directory = current_dir.parent / "results"
+
+    jsonl_files = sys.argv[1:] or sorted(glob.glob(os.path.join(log_directory, "*_validation.jsonl")))
+
+    if not jsonl_files:
+        print(f"❌ 在目录 {log_directory} 中没有找到结构化日志文件")
+        sys.exit(1)
+
+    for jsonl_file in jsonl_files:
+        log_file_path = os.path.splitext(jsonl_file)[0] + ".log"
+        render_log_file(jsonl_file, log_file_path)
+        print(f"📝 已生成: {log_file_path}")